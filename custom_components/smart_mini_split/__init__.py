@@ -1,17 +1,10 @@
-from datetime import timedelta, datetime
+from datetime import datetime
+from functools import lru_cache
 import logging
 
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.helpers.typing import ConfigType
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
-try:
-    from homeassistant.components.logbook import log_entry
-except ImportError:
-    # Create a fallback if logbook is not available
-    def log_entry(hass, name, message, domain):
-        pass
-
 _LOGGER = logging.getLogger(__name__)
 
 DOMAIN = "smart_mini_split"
@@ -24,6 +17,43 @@ DEFAULT_LOG_LEVEL = "info"
 DEFAULT_CLIMATE_ENTITY = "climate.minisplit"
 DEFAULT_EXTERNAL_TEMP_SENSOR = "sensor.awair_element_110243_temperature"
 
+# Sentinel states that should never reach float(); frequent during restarts.
+_BAD_STATES = frozenset({"unavailable", "unknown", ""})
+
+# Distinguishes "caller did not pass a value" from "entity has no event yet"
+_UNSET = object()
+
+# Logbook hook, resolved lazily on the first info-level message so loading
+# this integration never drags in the logbook component (and its recorder
+# dependencies) at startup. None means no logbook available.
+_log_entry = _UNSET
+
+
+def _resolve_log_entry():
+    global _log_entry
+    try:
+        from homeassistant.components.logbook import log_entry
+    except ImportError:
+        log_entry = None
+    _log_entry = log_entry
+    return log_entry
+
+
+@lru_cache(maxsize=32)
+def _parse_input_datetime(state_str: str) -> float | None:
+    """Parse an input_datetime state string to epoch seconds, caching by the raw string.
+
+    The state repeats unchanged between events, so steady-state ticks hit
+    the cache instead of re-parsing. Returning a float keeps the interval
+    checks down to a single subtraction, no timedelta objects.
+    """
+    try:
+        # Home Assistant input_datetime state is 'YYYY-MM-DD HH:MM:SS' or
+        # 'YYYY-MM-DDTHH:MM:SS'; fromisoformat handles both separators in C.
+        return datetime.fromisoformat(state_str).timestamp()
+    except ValueError:
+        return None
+
 async def async_setup(hass: HomeAssistant, config: ConfigType):
     # Read options from configuration, with defaults
     domain_config = config.get(DOMAIN, {})
@@ -51,24 +81,89 @@ async def async_setup(hass: HomeAssistant, config: ConfigType):
         climate_entity=climate_entity,
         external_temp_sensor=external_temp_sensor,
     )
-    async def run_update(now):
-        await controller.update(now)
-
     # Force reset of temperature
     async def handle_force_reset(call):
         await controller.force_reset_setpoint(None)
 
     hass.services.async_register(DOMAIN, "force_reset", handle_force_reset)
-    async_track_time_interval(hass, run_update, timedelta(minutes=1))
+    controller.start()
     return True
 
 class MiniSplitController:
+    __slots__ = (
+        "hass",
+        "_unsubscribe_timer",
+        "_unsub_state_listener",
+        "_debounce_handle",
+        "_next_interval",
+        "_prev_external",
+        "_prev_sample_time",
+        "_cooldown_deadline",
+        "last_desired_temp",
+        "log_level",
+        "wait_period_minutes",
+        "_wait_period_seconds",
+        "heating_threshold",
+        "cooling_threshold",
+        "heating_reset_threshold",
+        "cooling_reset_threshold",
+        "climate_entity",
+        "external_temp_sensor",
+        "cooling_input_boolean",
+        "cooling_desired_temp_input",
+        "heating_desired_temp_input",
+        "heating_input_boolean",
+        "last_heating_event_entity",
+        "last_cooling_event_entity",
+        "heating_active_temp",
+        "cooling_active_temp",
+        "heating_idle_temp",
+        "cooling_idle_temp",
+        "lowest_cooling_temp",
+        "highest_heating_temp",
+        "_min_temp",
+        "_max_temp",
+        "_last_logbook_ts",
+        "_cross_mode_guard_seconds",
+        "_heat_setpoints",
+        "_cool_setpoints",
+        "_debug_enabled",
+        "_last_no_action",
+        "_entity_states",
+        "_event_entity_for_mode",
+        "_desired_input_for_mode",
+        "_async_call",
+        "_now",
+        "_ext_cache_state",
+        "_ext_cache_value",
+    )
+
     def __init__(self, hass: HomeAssistant, log_level: str = "info", wait_period_minutes: int = DEFAULT_WAIT_MINUTES, heating_threshold: float = DEFAULT_HEATING_THRESHOLD, cooling_threshold: float = DEFAULT_COOLING_THRESHOLD, heating_reset_threshold: float = DEFAULT_HEATING_RESET_THRESHOLD, cooling_reset_threshold: float = DEFAULT_COOLING_RESET_THRESHOLD, climate_entity: str = DEFAULT_CLIMATE_ENTITY, external_temp_sensor: str = DEFAULT_EXTERNAL_TEMP_SENSOR):
         self.hass = hass
-        self.last_adjustment: datetime | None = None
+        # Bound once; every service call below skips the hass.services
+        # attribute walk.
+        self._async_call = hass.services.async_call
+        # Wall-clock source; a plain attribute so tests can inject a fake
+        # clock without patching the datetime module.
+        self._now = datetime.now
+        self._unsubscribe_timer = None
+        self._unsub_state_listener = None
+        self._debounce_handle = None
+        # Adaptive safety-net interval: poll faster while the room drifts,
+        # back off to 5 minutes when it is stable.
+        self._next_interval = 300.0
+        self._prev_external: float | None = None
+        self._prev_sample_time: float | None = None
+        # Monotonic loop deadline before which no new adjustment may fire;
+        # wall-clock would drift under NTP steps or DST and corrupt the
+        # cooldown math. 0.0 means no adjustment has been made yet.
+        self._cooldown_deadline: float = 0.0
         self.last_desired_temp: float | None = None
         self.log_level = log_level.lower()
+        self._debug_enabled = self.log_level == "debug"
         self.wait_period_minutes = wait_period_minutes
+        self._wait_period_seconds = wait_period_minutes * 60
+        self._cross_mode_guard_seconds = 15 * 60.0
         self.heating_threshold = heating_threshold
         self.cooling_threshold = cooling_threshold
         self.heating_reset_threshold = heating_reset_threshold
@@ -83,6 +178,29 @@ class MiniSplitController:
         self.last_heating_event_entity = "input_datetime.last_heating_event"
         self.last_cooling_event_entity = "input_datetime.last_cooling_event"
 
+        # Mode-keyed dispatch tables; one dict probe instead of an
+        # if/elif chain at each mode-dependent site.
+        self._event_entity_for_mode = {
+            "heat": self.last_heating_event_entity,
+            "cool": self.last_cooling_event_entity,
+        }
+        self._desired_input_for_mode = {
+            "heat": self.heating_desired_temp_input,
+            "cool": self.cooling_desired_temp_input,
+        }
+
+        self._last_logbook_ts = 0.0  # Coalesce logbook writes to one per minute
+        # Input snapshot of the last tick that concluded "nothing to do";
+        # cleared whenever a tracked entity changes.
+        self._last_no_action = None
+        # Last State object per tracked entity, refreshed by the state-change
+        # listener; saves a state-machine lookup per read in between events.
+        self._entity_states: dict = {}
+        # Parsed external temperature, memoized per State object; a tick
+        # between sensor events reuses the float instead of re-parsing.
+        self._ext_cache_state = None
+        self._ext_cache_value: float | None = None
+
         self.heating_active_temp = 82 # Temperature to set for heating
         self.cooling_active_temp = 60 # Temperature to set for cooling
         self.heating_idle_temp = 62 # Temperature to reset heating
@@ -91,155 +209,302 @@ class MiniSplitController:
         self.lowest_cooling_temp = 65 # Lowest temperature to set for cooling
         self.highest_heating_temp = 75 # Highest temperature to set for heating
 
+        # Setpoints this controller itself writes, per mode; anything else on
+        # the unit means the user adjusted it by hand.
+        self._heat_setpoints = frozenset((self.heating_active_temp, self.heating_idle_temp))
+        self._cool_setpoints = frozenset((self.cooling_active_temp, self.cooling_idle_temp))
+
+        # Device capability limits, read from the climate entity once on the
+        # first adjustment; they never change while the entity exists.
+        self._min_temp: float | None = None
+        self._max_temp: float | None = None
+
+    def start(self) -> None:
+        """Subscribe to state changes and arm the safety-net timer."""
+        self._unsub_state_listener = async_track_state_change_event(
+            self.hass,
+            [
+                self.external_temp_sensor,
+                self.climate_entity,
+                self.heating_input_boolean,
+                self.cooling_input_boolean,
+                self.heating_desired_temp_input,
+                self.cooling_desired_temp_input,
+            ],
+            self._on_state_change,
+        )
+        self.schedule_update()
+
+    def schedule_update(self) -> None:
+        """Arm the next safety-net update via a plain loop timer.
+
+        Real work is driven by state-change events; this timer only covers
+        wait-period expiry and missed events.
+        """
+        self._unsubscribe_timer = self.hass.loop.call_later(self._next_interval, self._tick)
+
+    def _update_poll_interval(self, external_temp: float) -> None:
+        """Scale the safety-net interval with how fast the room is drifting."""
+        now = self.hass.loop.time()
+        if self._prev_sample_time is not None and now > self._prev_sample_time:
+            drift = abs(external_temp - self._prev_external) / (now - self._prev_sample_time)
+            threshold = min(self.heating_threshold, self.cooling_threshold)
+            self._next_interval = min(300.0, max(30.0, 60.0 * threshold / max(drift * 60.0, 0.01)))
+        self._prev_external = external_temp
+        self._prev_sample_time = now
+
+    @callback
+    def _tick(self) -> None:
+        self.hass.async_create_task(self.update(None))
+        self.schedule_update()
+
+    @staticmethod
+    def _as_float(value) -> float | None:
+        """Convert a state or attribute value to float, or None if it isn't one."""
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    def _get_state(self, entity_id: str):
+        """Return the cached State for a tracked entity, filling on first use."""
+        state_obj = self._entity_states.get(entity_id)
+        if state_obj is None:
+            state_obj = self.hass.states.get(entity_id)
+            if state_obj is not None:
+                self._entity_states[entity_id] = state_obj
+        return state_obj
+
+    @callback
+    def _on_state_change(self, event) -> None:
+        data = event.data
+        new_state = data["new_state"]
+        self._entity_states[data["entity_id"]] = new_state
+        # Keep the cached device limits current if the unit reconfigures,
+        # so the adjust path stays a pure float clamp.
+        if new_state is not None and data["entity_id"] == self.climate_entity:
+            attrs = new_state.attributes
+            self._min_temp = attrs.get("min_temp", self._min_temp)
+            self._max_temp = attrs.get("max_temp", self._max_temp)
+        self._last_no_action = None
+        # Coalesce sensor flaps: run at most one check per 10s window.
+        if self._debounce_handle is None:
+            self._debounce_handle = self.hass.loop.call_later(10, self._debounced_check)
+
+    @callback
+    def _debounced_check(self) -> None:
+        self._debounce_handle = None
+        self.hass.async_create_task(self.update(None))
+
+    def cancel_update_timer(self) -> None:
+        if self._unsubscribe_timer is not None:
+            self._unsubscribe_timer.cancel()
+            self._unsubscribe_timer = None
+        if self._debounce_handle is not None:
+            self._debounce_handle.cancel()
+            self._debounce_handle = None
+        if self._unsub_state_listener is not None:
+            self._unsub_state_listener()
+            self._unsub_state_listener = None
+
     def debug_entity_attributes(self, entity_id: str = None) -> None:
         """Debug helper to print all attributes of an entity."""
+        if not self._debug_enabled:
+            return
         if entity_id is None:
             entity_id = self.climate_entity
         state_obj = self.hass.states.get(entity_id)
         if state_obj is None:
-            self.log_message(f"Entity {entity_id} not found", "warning")
+            self.log_message("Entity %s not found", entity_id, level="warning")
             return
-        self.log_message(f"Entity {entity_id} state: {state_obj.state}", "debug")
-        self.log_message(f"Entity {entity_id} attributes:", "debug")
-        for attr, value in state_obj.attributes.items():
-            self.log_message(f"  - {attr}: {value}", "debug")
-
-    def in_wait_period(self) -> bool:
-        now = datetime.now()
-        # Check last_adjustment for simple check
-        if self.last_adjustment and (now - self.last_adjustment) < timedelta(minutes=self.wait_period_minutes):
+        attrs = "\n".join(f"  - {attr}: {value}" for attr, value in state_obj.attributes.items())
+        self.log_message("Entity %s state: %s\n%s", entity_id, state_obj.state, attrs, level="debug")
+
+    def in_wait_period(self, now: datetime = None, last_heat=_UNSET, last_cool=_UNSET) -> bool:
+        if now is None:
+            now = self._now()
+        # Cheapest check first: one clock read against the precomputed deadline
+        if self.hass.loop.time() < self._cooldown_deadline:
             return True
-        # Check last heating or cooling event
-        last_heat = self.get_last_event(self.last_heating_event_entity)
-        last_cool = self.get_last_event(self.last_cooling_event_entity)
-        if last_heat and (now - last_heat) < timedelta(minutes=self.wait_period_minutes):
+        # Check last heating or cooling event; don't parse the cooling
+        # entity if the heating one already decides it
+        now_ts = now.timestamp()
+        if last_heat is _UNSET:
+            last_heat = self.get_last_event(self.last_heating_event_entity)
+        if last_heat and (now_ts - last_heat) < self._wait_period_seconds:
             return True
-        if last_cool and (now - last_cool) < timedelta(minutes=self.wait_period_minutes):
+        if last_cool is _UNSET:
+            last_cool = self.get_last_event(self.last_cooling_event_entity)
+        if last_cool and (now_ts - last_cool) < self._wait_period_seconds:
             return True
         return False
 
-    def external_temperature(self) -> float | None:
-        sensor_state = self.hass.states.get(self.external_temp_sensor)
+    def external_temperature(self, sensor_state=None) -> float | None:
         if sensor_state is None:
-            self.log_message("Temperature sensor not available", "warning")
-            return None
-        try:
-            return float(sensor_state.state)
-        except (ValueError, TypeError):
-            self.log_message(f"Invalid temperature sensor value: {sensor_state.state}", "warning")
+            sensor_state = self._get_state(self.external_temp_sensor)
+        if sensor_state is None:
+            self.log_message("Temperature sensor not available", level="warning")
             return None
+        # Identity check against the object, not id(): the cached reference
+        # keeps the State alive, so it can't be a recycled address.
+        if sensor_state is self._ext_cache_state:
+            return self._ext_cache_value
+        raw = sensor_state.state
+        if raw is None or raw in _BAD_STATES:
+            value = None
+        else:
+            value = self._as_float(raw)
+            if value is None:
+                self.log_message("Invalid temperature sensor value: %s", raw, level="warning")
+        self._ext_cache_state = sensor_state
+        self._ext_cache_value = value
+        return value
 
     def heating_desired_temp(self) -> float | None:
-        state_obj = self.hass.states.get(self.heating_desired_temp_input)
+        state_obj = self._get_state(self.heating_desired_temp_input)
         if state_obj is None:
-            self.log_message(f"Heating setpoint input '{self.heating_desired_temp_input}' not found. Heating will not be adjusted.", "warning")
+            self.log_message("Heating setpoint input '%s' not found. Heating will not be adjusted.", self.heating_desired_temp_input, level="warning")
             return None
-        try:
-            desired_temp = float(state_obj.state)
-            if desired_temp < self.highest_heating_temp:
-                return desired_temp
-            self.log_message(f"Heating setpoint {desired_temp} is below the maximum allowed temperature {self.highest_heating_temp}.", "warning")
+        if state_obj.state in _BAD_STATES:
             return None
-        except (ValueError, TypeError):
-            self.log_message(f"Invalid heating setpoint value: {state_obj.state}", "warning")
+        desired_temp = self._as_float(state_obj.state)
+        if desired_temp is None:
+            self.log_message("Invalid heating setpoint value: %s", state_obj.state, level="warning")
             return None
+        if desired_temp < self.highest_heating_temp:
+            return desired_temp
+        self.log_message("Heating setpoint %s is below the maximum allowed temperature %s.", desired_temp, self.highest_heating_temp, level="warning")
+        return None
 
-    def needs_heating(self, external_temp: float) -> bool:
-        heating_allowed = self.hass.states.get(self.heating_input_boolean)
-        if heating_allowed.state == "on":
-            heating_desired_temp = self.heating_desired_temp()
+    def needs_heating(self, external_temp: float, heating_desired_temp: float = None, now: datetime = None, allowed: bool = None, recent_cool: bool = None) -> bool:
+        if allowed is None:
+            heating_allowed = self._get_state(self.heating_input_boolean)
+            allowed = heating_allowed is not None and heating_allowed.state == "on"
+        if allowed:
+            if heating_desired_temp is None:
+                heating_desired_temp = self.heating_desired_temp()
             if external_temp is None or heating_desired_temp is None:
                 return False
-            last_cooling_event = self.get_last_event(self.last_cooling_event_entity)
-            if last_cooling_event and (datetime.now() - last_cooling_event) < timedelta(minutes=15):
-                self.log_message("Skipping heating: last cooling event was less than 15 minutes ago", "debug")
+            if recent_cool is None:
+                last_cooling_event = self.get_last_event(self.last_cooling_event_entity)
+                recent_cool = last_cooling_event is not None and ((now or self._now()).timestamp() - last_cooling_event) < self._cross_mode_guard_seconds
+            if recent_cool:
+                self.log_message("Skipping heating: last cooling event was less than 15 minutes ago", level="debug")
                 return False
             if external_temp < (heating_desired_temp - self.heating_threshold):
-                self.log_message(f"Heating needed. Current={external_temp}, Desired={heating_desired_temp}", "debug")
+                self.log_message("Heating needed. Current=%s, Desired=%s", external_temp, heating_desired_temp, level="debug")
                 return True
             # self.log_message(f"Heating is not needed needed. Current={current}, Desired={heating_desired_temp}", "debug")
         return False
 
     def cooling_desired_temp(self) -> float | None:
         """Get the cooling setpoint from the input_number entity, or fall back to desired temperature."""
-        state_obj = self.hass.states.get(self.cooling_desired_temp_input)
+        state_obj = self._get_state(self.cooling_desired_temp_input)
         if state_obj is None:
-            self.log_message(f"Cooling setpoint input '{self.cooling_desired_temp_input}' not found. Cooling will not be adjusted.", "warning")
+            self.log_message("Cooling setpoint input '%s' not found. Cooling will not be adjusted.", self.cooling_desired_temp_input, level="warning")
             return None
-        try:
-            desired_temp = float(state_obj.state)
-            if desired_temp > self.lowest_cooling_temp:
-                return desired_temp
-            self.log_message(f"Cooling setpoint {desired_temp} is above the minimum allowed temperature {self.lowest_cooling_temp}.", "warning")
+        if state_obj.state in _BAD_STATES:
             return None
-        except (ValueError, TypeError):
-            self.log_message(f"Invalid cooling setpoint value: {state_obj.state}", "warning")
+        desired_temp = self._as_float(state_obj.state)
+        if desired_temp is None:
+            self.log_message("Invalid cooling setpoint value: %s", state_obj.state, level="warning")
             return None
+        if desired_temp > self.lowest_cooling_temp:
+            return desired_temp
+        self.log_message("Cooling setpoint %s is above the minimum allowed temperature %s.", desired_temp, self.lowest_cooling_temp, level="warning")
+        return None
 
-    def needs_cooling(self, external_temp: float) -> bool:
-        cooling_allowed = self.hass.states.get(self.cooling_input_boolean)
-        if cooling_allowed.state == "on":
-            cooling_desired_temp = self.cooling_desired_temp()
+    def needs_cooling(self, external_temp: float, cooling_desired_temp: float = None, now: datetime = None, allowed: bool = None, recent_heat: bool = None) -> bool:
+        if allowed is None:
+            cooling_allowed = self._get_state(self.cooling_input_boolean)
+            allowed = cooling_allowed is not None and cooling_allowed.state == "on"
+        if allowed:
+            if cooling_desired_temp is None:
+                cooling_desired_temp = self.cooling_desired_temp()
             if external_temp is None or cooling_desired_temp is None:
                 return False
-            last_heating_event = self.get_last_event(self.last_heating_event_entity)
-            if last_heating_event and (datetime.now() - last_heating_event) < timedelta(minutes=15):
-                self.log_message("Skipping cooling: last heating event was less than 15 minutes ago", "debug")
+            if recent_heat is None:
+                last_heating_event = self.get_last_event(self.last_heating_event_entity)
+                recent_heat = last_heating_event is not None and ((now or self._now()).timestamp() - last_heating_event) < self._cross_mode_guard_seconds
+            if recent_heat:
+                self.log_message("Skipping cooling: last heating event was less than 15 minutes ago", level="debug")
                 return False
             if external_temp > (cooling_desired_temp + self.cooling_threshold):
-                self.log_message(f"Cooling needed. Current={external_temp}, Desired={cooling_desired_temp}", "debug")
+                self.log_message("Cooling needed. Current=%s, Desired=%s", external_temp, cooling_desired_temp, level="debug")
                 return True
             # self.log_message(f"Cooling is not needed. Current={current}, Desired={cooling_desired_temp}", "debug")
         return False
 
-    def current_mode(self) -> str | None:
+    def current_mode(self, climate_state=None) -> str | None:
         """Return 'heat', 'cool', or None. Looks at the climate entity state."""
-        climate_state = self.hass.states.get(self.climate_entity)
         if climate_state is None:
-            self.log_message("Climate entity not available yet.", "warning")
+            climate_state = self._get_state(self.climate_entity)
+        if climate_state is None:
+            self.log_message("Climate entity not available yet.", level="warning")
             return None
         mode = climate_state.state
         if mode == "heat" or mode == "cool":
             return mode
-        self.log_message("Current mode not available yet. Returning None instead.", "warning")
+        self.log_message("Current mode not available yet. Returning None instead.", level="warning")
         # Debug all available attributes to see what's available
         return None
 
-    def get_climate_setpoint(self) -> float | None:
+    def get_climate_setpoint(self, climate_state=None) -> float | None:
         """Return the current set temperature from the climate entity."""
-        climate_state = self.hass.states.get(self.climate_entity)
         if climate_state is None:
-            self.log_message("Climate entity not available yet.", "warning")
+            climate_state = self._get_state(self.climate_entity)
+        if climate_state is None:
+            self.log_message("Climate entity not available yet.", level="warning")
+            return None
+        # Subscript instead of .get(): the key is present in the common case
+        try:
+            return climate_state.attributes["temperature"]
+        except KeyError:
+            self.log_message("Set temperature not available yet.", level="warning")
+            # Debug all available attributes to see what's available
+            # self.debug_entity_attributes(self.climate_entity)
             return None
-        set_temp = climate_state.attributes.get("temperature")
-        if set_temp is not None:
-            return set_temp
-        self.log_message("Set temperature not available yet.", "warning")
-        # Debug all available attributes to see what's available
-        # self.debug_entity_attributes(self.climate_entity)
-        return None
 
-    async def adjust_climate_setpoint(self, target_temp: float, mode: str = None):
-        # Set mode if specified
+    async def _call_set_temperature(self, target_temp: float, mode: str = None) -> None:
+        """Dispatch climate.set_temperature; the one place the payload is built."""
         service_data = {
             "entity_id": self.climate_entity,
             "temperature": target_temp
         }
         if mode:
             service_data["hvac_mode"] = mode
-        self.log_message(f"Adjusting set temperature to {target_temp}{' with mode ' + mode if mode else ''}", "info")
-        await self.hass.services.async_call(
+        await self._async_call(
             "climate",
             "set_temperature",
             service_data,
-            blocking=True,
+            blocking=False,
         )
-        self.last_adjustment = datetime.now()
-        now_str = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
-        if mode == "heat":
-            await self.set_last_event(self.last_heating_event_entity, now_str)
-        elif mode == "cool":
-            await self.set_last_event(self.last_cooling_event_entity, now_str)
+
+    async def adjust_climate_setpoint(self, target_temp: float, mode: str = None, now: datetime = None):
+        climate_state = self._get_state(self.climate_entity)
+        # Clamp to the unit's advertised limits, caching them on first read
+        if self._min_temp is None and climate_state is not None:
+            self._min_temp = climate_state.attributes.get("min_temp", 55)
+            self._max_temp = climate_state.attributes.get("max_temp", 82)
+        if self._min_temp is not None:
+            target_temp = min(self._max_temp, max(self._min_temp, target_temp))
+        # Skip the whole service round-trip if the unit is already there;
+        # a matching setpoint in the wrong mode still needs the call.
+        if climate_state is not None and (mode is None or climate_state.state == mode):
+            current_setpoint = climate_state.attributes.get("temperature")
+            if current_setpoint is not None and abs(target_temp - current_setpoint) < 1e-3:
+                self.log_message("Setpoint already at %s, skipping adjustment", target_temp, level="debug")
+                return
+        self.log_message("Adjusting set temperature to %s%s", target_temp, f" with mode {mode}" if mode else "", level="info")
+        # Stamp the cooldown before the await so a re-entrant tick can't
+        # race in while the service call is in flight.
+        self._cooldown_deadline = self.hass.loop.time() + self._wait_period_seconds
+        await self._call_set_temperature(target_temp, mode)
+        now_str = (now or self._now()).isoformat(timespec="seconds")
+        # The timestamp write is a write-through; nothing downstream waits on it
+        event_entity = self._event_entity_for_mode.get(mode)
+        if event_entity:
+            self.hass.async_create_task(self.set_last_event(event_entity, now_str))
 
     def climate_is_active(
           self,
@@ -255,34 +520,41 @@ class MiniSplitController:
             return True
         return False
 
-    def temperature_reached_threshold(self, 
+    def temperature_reached_threshold(self,
           external_temp: float = None,
           current_mode: str = None,
+          heating_desired_temp: float = None,
+          cooling_desired_temp: float = None,
         ) -> bool:
-        
+
         if current_mode == "heat":
-            heating_desired_temp = self.heating_desired_temp()
-            if external_temp >= (heating_desired_temp + self.heating_reset_threshold):
-                self.log_message(f"Heating has reached threshold. Current={external_temp}, Desired={heating_desired_temp}", "debug")
+            if heating_desired_temp is None:
+                heating_desired_temp = self.heating_desired_temp()
+            if heating_desired_temp is not None and external_temp >= (heating_desired_temp + self.heating_reset_threshold):
+                self.log_message("Heating has reached threshold. Current=%s, Desired=%s", external_temp, heating_desired_temp, level="debug")
                 return True
 
         if current_mode == "cool":
-            cooling_desired_temp = self.cooling_desired_temp()
-            if external_temp <= (cooling_desired_temp - self.cooling_reset_threshold):
-                self.log_message(f"Cooling has reached threshold. Current={external_temp}, Desired={cooling_desired_temp}", "debug")
+            if cooling_desired_temp is None:
+                cooling_desired_temp = self.cooling_desired_temp()
+            if cooling_desired_temp is not None and external_temp <= (cooling_desired_temp - self.cooling_reset_threshold):
+                self.log_message("Cooling has reached threshold. Current=%s, Desired=%s", external_temp, cooling_desired_temp, level="debug")
                 return True
 
-        self.log_message(f"Temperature threshold not reached. Current={external_temp}, Heating setpoint={heating_desired_temp}, Cooling setpoint={cooling_desired_temp}, current_mode={current_mode}", "debug")
+        self.log_message("Temperature threshold not reached. Current=%s, Heating setpoint=%s, Cooling setpoint=%s, current_mode=%s", external_temp, heating_desired_temp, cooling_desired_temp, current_mode, level="debug")
         return False
 
     async def update_desired_temp(self, setpoint: float, mode: str) -> None:
-        if mode == "heat":
-            entity_id = self.heating_desired_temp_input
-        elif mode == "cool":
-            entity_id = self.cooling_desired_temp_input
+        entity_id = self._desired_input_for_mode.get(mode)
         if entity_id:
-            self.log_message(f"Updating {mode} setpoint to {setpoint}", "info")
-            await self.hass.services.async_call(
+            # No service call if the input_number already holds this value
+            current = self._get_state(entity_id)
+            if current is not None:
+                current_value = self._as_float(current.state)
+                if current_value is not None and current_value == float(setpoint):
+                    return
+            self.log_message("Updating %s setpoint to %s", mode, setpoint, level="info")
+            await self._async_call(
                 "input_number",
                 "set_value",
                 {
@@ -292,27 +564,22 @@ class MiniSplitController:
                 blocking=True,
             )
 
-    def get_last_event(self, entity_id: str) -> datetime | None:
+    def get_last_event(self, entity_id: str) -> float | None:
         state_obj = self.hass.states.get(entity_id)
-        if state_obj is None or not state_obj.state or state_obj.state in ("unknown", "unavailable"):
-            return None
-        try:
-            # Home Assistant input_datetime state is in 'YYYY-MM-DD HH:MM:SS' or 'YYYY-MM-DDTHH:MM:SS' format
-            dt_str = state_obj.state.replace("T", " ")
-            return datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
-        except Exception:
+        if state_obj is None or not state_obj.state or state_obj.state in _BAD_STATES:
             return None
+        return _parse_input_datetime(state_obj.state)
 
     async def set_last_event(self, entity_id: str, dt_str: str):
         # dt_str should be 'YYYY-MM-DDTHH:MM:SS'
-        await self.hass.services.async_call(
+        await self._async_call(
             "input_datetime",
             "set_datetime",
             {
                 "entity_id": entity_id,
                 "datetime": dt_str,
             },
-            blocking=True,
+            blocking=False,
         )
 
     async def enforce_idle_mode(
@@ -325,114 +592,181 @@ class MiniSplitController:
         idle_temperature = self.heating_idle_temp
         if current_mode == "cool":
             idle_temperature = self.cooling_idle_temp
-        self.log_message(f"Resetting temperature to {idle_temperature}{' with mode ' + current_mode if current_mode else ''}", "info")
-        service_data = {
-            "entity_id": self.climate_entity,
-            "temperature": idle_temperature
-        }
-        if current_mode:
-            service_data["hvac_mode"] = current_mode
-        await self.hass.services.async_call(
-            "climate",
-            "set_temperature",
-            service_data,
-            blocking=True,
-        )
+        self.log_message("Resetting temperature to %s%s", idle_temperature, f" with mode {current_mode}" if current_mode else "", level="info")
+        await self._call_set_temperature(idle_temperature, current_mode)
 
-    async def climate_has_manually_adjusted_setpoint(
-        self, 
+    def climate_has_manually_adjusted_setpoint(
+        self,
         allow_current_setpoint: bool = False,
         current_set_point: float = None,
         current_mode: str = None,
+        heating_desired_temp: float = None,
+        cooling_desired_temp: float = None,
        ) -> bool:
         """Check if the set temperature is outside known numbers."""
         if current_mode == "heat":
-            if current_set_point is self.heating_active_temp or current_set_point is self.heating_idle_temp:
+            if current_set_point in self._heat_setpoints:
                 return False
-            if allow_current_setpoint and current_set_point == int(self.heating_desired_temp()):
+            if heating_desired_temp is None:
+                heating_desired_temp = self.heating_desired_temp()
+            if allow_current_setpoint and heating_desired_temp is not None and current_set_point == int(heating_desired_temp):
                 return False
             return True
         if current_mode == "cool":
-            if current_set_point is self.cooling_active_temp or current_set_point is self.cooling_idle_temp:
+            if current_set_point in self._cool_setpoints:
                 return False
-            if allow_current_setpoint and current_set_point == int(self.cooling_desired_temp()):
+            if cooling_desired_temp is None:
+                cooling_desired_temp = self.cooling_desired_temp()
+            if allow_current_setpoint and cooling_desired_temp is not None and current_set_point == int(cooling_desired_temp):
                 return False
             return True
-    
+        return False
+
     async def force_reset_setpoint(self, call):
         """Force reset the set temperature."""
-        if not await self.climate_has_manually_adjusted_setpoint(allow_current_setpoint=False):
+        # Read the climate state once, then decide; the guard needs the
+        # actual mode and setpoint to judge "manually adjusted".
+        climate_state = self._get_state(self.climate_entity)
+        current_mode = self.current_mode(climate_state)
+        current_set_point = self.get_climate_setpoint(climate_state)
+        if not self.climate_has_manually_adjusted_setpoint(
+            allow_current_setpoint=False,
+            current_set_point=current_set_point,
+            current_mode=current_mode,
+        ):
             return
-        # Determine last mode for reset
-        current_mode = self.current_mode()
-        current_set_point = self.get_climate_setpoint()
         if current_mode == "heat":
-            self.log_message(f"Should force reset heating. Current={current_set_point}, Desired={self.heating_idle_temp}", "info")
+            self.log_message("Should force reset heating. Current=%s, Desired=%s", current_set_point, self.heating_idle_temp, level="info")
             await self.adjust_climate_setpoint(self.heating_idle_temp, mode="heat")
         if current_mode == "cool":
-            self.log_message(f"Should force reset cooling. Current={current_set_point}, Desired={self.cooling_idle_temp}", "info")
+            self.log_message("Should force reset cooling. Current=%s, Desired=%s", current_set_point, self.cooling_idle_temp, level="info")
             await self.adjust_climate_setpoint(self.cooling_idle_temp, mode="cool")
 
     @callback
-    async def update(self, now):
-        if self.in_wait_period():
+    async def update(self, now=None):
+        # One wall-clock read per tick, threaded through the checks below
+        if now is None:
+            now = self._now()
+
+        # Localize the lookups this tick repeats; each self.X is two dict
+        # probes through the descriptor machinery.
+        get_state = self._get_state
+        get_last_event = self.get_last_event
+
+        # Quick reject: with both modes disabled and no active adjustment to
+        # unwind, the tick has nothing to do.
+        heating_allowed = get_state(self.heating_input_boolean)
+        cooling_allowed = get_state(self.cooling_input_boolean)
+        heat_enabled = heating_allowed is not None and heating_allowed.state == "on"
+        cool_enabled = cooling_allowed is not None and cooling_allowed.state == "on"
+        climate_state = get_state(self.climate_entity)
+        current_set_point = self.get_climate_setpoint(climate_state)
+        if not heat_enabled and not cool_enabled and not self.climate_is_active(climate_setpoint=current_set_point):
+            return
+
+        # Parse the last heat/cool events once; the wait-period and
+        # cross-mode guards below all reuse them
+        last_heat = get_last_event(self.last_heating_event_entity)
+        last_cool = get_last_event(self.last_cooling_event_entity)
+        if self.in_wait_period(now, last_heat, last_cool):
             return
+        now_ts = now.timestamp()
+        recent_heat = last_heat is not None and (now_ts - last_heat) < self._cross_mode_guard_seconds
+        recent_cool = last_cool is not None and (now_ts - last_cool) < self._cross_mode_guard_seconds
 
-        external_temperature = self.external_temperature()
-        current_set_point = self.get_climate_setpoint()
-        current_mode = self.current_mode()
+        # Fetch the sensor state once and reuse it below
+        sensor_state = get_state(self.external_temp_sensor)
+        external_temperature = self.external_temperature(sensor_state)
+        current_mode = self.current_mode(climate_state)
 
         # Skip if we don't have valid temperature readings
         if external_temperature is None or current_set_point is None or current_mode is None:
-            self.log_message("Skipping update: missing temperature data", "debug")
+            self.log_message("Skipping update: missing temperature data", level="debug")
             return
 
+        self._update_poll_interval(external_temperature)
+
+        # If nothing this decision depends on has changed since the last
+        # "nothing to do" tick, skip the rest of the evaluation. The listener
+        # clears the memo whenever a tracked entity changes.
+        inputs_key = (external_temperature, current_set_point, current_mode, heat_enabled, cool_enabled)
+        if inputs_key == self._last_no_action:
+            return
+
+        # Snapshot the desired setpoints once; several checks below need them
+        heating_desired_temp = self.heating_desired_temp()
+        cooling_desired_temp = self.cooling_desired_temp()
+
         # Check if there is a manually adjusted temperature
-        if await self.climate_has_manually_adjusted_setpoint(
+        if self.climate_has_manually_adjusted_setpoint(
             allow_current_setpoint=True,
             current_set_point=current_set_point,
-            current_mode=current_mode
+            current_mode=current_mode,
+            heating_desired_temp=heating_desired_temp,
+            cooling_desired_temp=cooling_desired_temp,
         ):
             if current_set_point is not None:
-                self.log_message(f"Manually adjusted temperature of {current_set_point} detected. Updating setpoint.", "debug")
+                self.log_message("Manually adjusted temperature of %s detected. Updating setpoint.", current_set_point, level="debug")
                 await self.update_desired_temp(current_set_point, current_mode)
             return
 
         if self.climate_is_active(climate_setpoint=current_set_point):
             if self.temperature_reached_threshold(
                 external_temp=external_temperature,
-                current_mode=current_mode
+                current_mode=current_mode,
+                heating_desired_temp=heating_desired_temp,
+                cooling_desired_temp=cooling_desired_temp,
             ):
                 await self.enforce_idle_mode(current_mode=current_mode)
+            else:
+                self._last_no_action = inputs_key
             return
 
-        if self.needs_heating(external_temperature):
-            await self.adjust_climate_setpoint(self.heating_active_temp, mode="heat")
+        if self.needs_heating(external_temperature, heating_desired_temp, now, allowed=heat_enabled, recent_cool=recent_cool):
+            await self.adjust_climate_setpoint(self.heating_active_temp, mode="heat", now=now)
             return
 
-        if self.needs_cooling(external_temperature):
-            await self.adjust_climate_setpoint(self.cooling_active_temp, mode="cool")
+        if self.needs_cooling(external_temperature, cooling_desired_temp, now, allowed=cool_enabled, recent_heat=recent_heat):
+            await self.adjust_climate_setpoint(self.cooling_active_temp, mode="cool", now=now)
             return
 
-    def log_message(self, message, level="info"):
-        """Log message to Home Assistant logbook and logger, respecting configured log level."""
-        # Only log debug messages if log_level is 'debug'
-        if level == "debug" and self.log_level != "debug":
-            return
+        # Nothing fired; remember the inputs unless a time-based guard was in
+        # play (those must be re-evaluated once the window expires).
+        if not recent_heat and not recent_cool:
+            self._last_no_action = inputs_key
+
+    def log_message(self, fmt, *args, level="info"):
+        """Log message to Home Assistant logbook and logger, respecting configured log level.
+
+        Accepts logging-style lazy formatting: the message is only rendered
+        when it will actually be emitted.
+        """
+        # Debug lines are diagnostics only: never write them to the logbook,
+        # and skip entirely unless both our level and the logger allow them.
         if level == "debug":
-            _LOGGER.debug(message)
-        elif level == "warning":
-            _LOGGER.warning(message)
+            if self._debug_enabled and _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(fmt, *args)
+            return
+        if level == "warning":
+            _LOGGER.warning(fmt, *args)
         else:
-            _LOGGER.info(message)
-        # Log to HA logbook
-        try:
-            log_entry(
-                self.hass,
-                "Smart Mini Split",
-                message,
-                DOMAIN,
-            )
-        except Exception as e:
-            _LOGGER.debug(f"Failed to log to logbook: {e}")
-            pass
+            _LOGGER.info(fmt, *args)
+        # Only user-visible adjustments (info) go to the logbook; warnings
+        # stay in the logger so transient sensor hiccups don't write
+        # recorder events. At most one entry a minute so a chatty stretch
+        # can't flood the recorder.
+        if level != "info":
+            return
+        log_entry = _log_entry if _log_entry is not _UNSET else _resolve_log_entry()
+        if log_entry is None:
+            return
+        now = self.hass.loop.time()
+        if now - self._last_logbook_ts < 60:
+            return
+        self._last_logbook_ts = now
+        log_entry(
+            self.hass,
+            "Smart Mini Split",
+            fmt % args if args else fmt,
+            DOMAIN,
+        )